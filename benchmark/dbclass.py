@@ -1,19 +1,56 @@
 from __future__ import annotations
 
-import shelve
+import os
 import shutil
+import threading
 from pathlib import Path
 
-from rocksdict import Options, Rdict
+from rocksdict import (
+    BlockBasedOptions,
+    Cache,
+    DataBlockIndexType,
+    DBCompressionType,
+    Options,
+    Rdict,
+    WriteBatch,
+    WriteOptions,
+)
 
-from flaxkv.pack import decode, encode
+from flaxkv.pack import msg_decoder, msg_encoder
+
+# Bound msgspec codecs (with flaxkv's numpy ext hooks) for the Redis hot path
+_ENC = msg_encoder.encode
+_DEC = msg_decoder.decode
 
 
 class RocksDict:
     rdict_path = "./test_rocksdict"
 
     def __init__(self):
-        self.db = Rdict(self.rdict_path)
+        self.db = Rdict(self.rdict_path, options=self._options())
+
+    @staticmethod
+    def _options():
+        cpu_count = os.cpu_count() or 1
+        opt = Options()
+        opt.increase_parallelism(cpu_count)
+        opt.set_max_background_jobs(cpu_count)
+        opt.set_max_subcompactions(cpu_count)
+        opt.set_write_buffer_size(128 << 20)
+        opt.set_max_write_buffer_number(max(4, cpu_count // 2))
+        opt.set_min_write_buffer_number_to_merge(2)
+        opt.set_level_zero_file_num_compaction_trigger(max(4, cpu_count * 4))
+        opt.set_level_compaction_dynamic_level_bytes(True)
+        # optimize_for_point_lookup() installs its own table factory, so the
+        # bloom filter, block cache and hash index all go on one table config
+        table_opt = BlockBasedOptions()
+        table_opt.set_bloom_filter(16, False)
+        table_opt.set_block_cache(Cache(256 << 20))
+        table_opt.set_data_block_index_type(DataBlockIndexType.binary_and_hash())
+        table_opt.set_data_block_hash_ratio(0.75)
+        opt.set_block_based_table_factory(table_opt)
+        opt.set_compression_type(DBCompressionType.lz4())
+        return opt
 
     def __setitem__(self, key, value):
         self.db[key] = value
@@ -21,6 +58,15 @@ class RocksDict:
     def __getitem__(self, key):
         return self.db[key]
 
+    def update(self, mapping: dict):
+        wb = WriteBatch()
+        for key, value in mapping.items():
+            wb.put(key, value)
+        # benchmark only: skip the WAL to isolate LSM cost
+        write_opt = WriteOptions()
+        write_opt.disable_wal = True
+        self.db.write(wb, write_opt)
+
     def __delitem__(self, key):
         del self.db[key]
 
@@ -42,6 +88,11 @@ class RocksDict:
 
 
 class ShelveDict:
+    """
+    shelve-like dict on top of gdbm (when available), storing msgspec-encoded
+    values instead of pickles.
+    """
+
     root_path = Path("./shelve_db")
     if not root_path.exists():
         root_path.mkdir(parents=True, exist_ok=True)
@@ -49,13 +100,21 @@ class ShelveDict:
     db_path = str(root_path / "test_shelve")
 
     def __init__(self):
-        self.sd = shelve.open(self.db_path)
+        try:
+            import dbm.gnu
+
+            # 'f': fast mode, gdbm does not sync to disk after every write
+            self.sd = dbm.gnu.open(self.db_path, "cf")
+        except ImportError:
+            import dbm
+
+            self.sd = dbm.open(self.db_path, "c")
 
     def __getitem__(self, key):
-        return self.sd[key]
+        return _DEC(self.sd[key])
 
     def __setitem__(self, key, value):
-        self.sd[key] = value
+        self.sd[key] = _ENC(value)
 
     def __delitem__(self, key):
         del self.sd[key]
@@ -64,16 +123,17 @@ class ShelveDict:
         return key in self.sd
 
     def __iter__(self):
-        return iter(self.sd)
+        return iter(self.keys())
 
     def __len__(self):
         return len(self.sd)
 
     def keys(self):
-        return self.sd.keys()
+        return [key.decode() for key in self.sd.keys()]
 
     def items(self):
-        return self.sd.items()
+        for key in self.sd.keys():
+            yield key.decode(), _DEC(self.sd[key])
 
     def destroy(self):
         self.sd.close()
@@ -81,17 +141,70 @@ class ShelveDict:
 
 
 class RedisDict:
+    """
+    Keys are expected to be bytes. Install `redis[hiredis]` so that redis-py
+    parses replies with the C parser.
+    """
+
+    _pool = None
+
     def __init__(self):
         import redis
 
-        self.client = redis.Redis(host="localhost", port=6379, db=0)
+        if RedisDict._pool is None:
+            RedisDict._pool = redis.BlockingConnectionPool(
+                host="localhost",
+                port=6379,
+                db=0,
+                max_connections=32,
+                socket_keepalive=True,
+                health_check_interval=0,
+            )
+        self._local = threading.local()
+
+    @property
+    def client(self):
+        # one client per thread, each holding a single pooled connection
+        client = getattr(self._local, "client", None)
+        if client is None:
+            import redis
+
+            client = redis.Redis(
+                connection_pool=self._pool, single_connection_client=True
+            )
+            self._local.client = client
+        return client
 
     def __getitem__(self, key):
         value = self.client.get(key)
-        return decode(value)
+        return _DEC(value)
 
     def __setitem__(self, key, value):
-        self.client.set(key, encode(value))
+        self.client.set(key, _ENC(value))
+
+    def get_raw(self, key):
+        return self.client.get(key)
+
+    def set_raw(self, key, raw_value: bytes):
+        self.client.set(key, raw_value)
+
+    def bulk_set(self, items, chunk=500, raw=False):
+        """
+        Args:
+            raw: values are already encoded bytes.
+        """
+        pipe = self.client.pipeline(transaction=False)
+        for i, (key, value) in enumerate(items, 1):
+            pipe.set(key, value if raw else _ENC(value))
+            if i % chunk == 0:
+                pipe.execute()
+        pipe.execute()
+
+    def update(self, mapping: dict):
+        self.client.mset({key: _ENC(value) for key, value in mapping.items()})
+
+    def get_many(self, keys):
+        return list(map(_DEC, self.client.mget(keys)))
 
     def __contains__(self, item):
         return self.client.exists(item)
@@ -102,13 +215,17 @@ class RedisDict:
     def keys(self):
         return self.client.keys('*')
 
-    def items(self):
-        keys = self.keys()
-        # values = self.client.mget(keys)
-        # for key, value in zip(keys, values):
-        #     yield key, decode(value)
-        for key in keys:
-            yield key, self[key]
+    def items(self, count=500):
+        # SCAN instead of a blocking `KEYS *`, one MGET round-trip per window
+        cursor = 0
+        while True:
+            cursor, keys = self.client.scan(cursor, count=count)
+            if keys:
+                values = self.client.mget(keys)
+                for key, value in zip(keys, values):
+                    yield key, _DEC(value)
+            if cursor == 0:
+                break
 
     def destroy(self):
         self.client.flushdb()
@@ -2,43 +2,55 @@ from __future__ import annotations
 
 import time
 
-import pandas as pd
-
 
 def wait_for_server_to_start(url, timeout=5):
+    import socket
+    from urllib.parse import urlsplit
+
     import httpx
 
-    start_time = time.time()
-    while True:
+    parts = urlsplit(url)
+    address = (parts.hostname, parts.port or (443 if parts.scheme == "https" else 80))
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        with socket.socket() as s:
+            s.settimeout(0.05)
+            try:
+                s.connect(address)
+            except OSError:
+                time.sleep(0.005)
+                continue
+        # the port accepts connections, confirm the app itself is up
         try:
-            response = httpx.get(url)
-            response.raise_for_status()
-            break
+            httpx.get(url).raise_for_status()
+            return
         except Exception:
-            time.sleep(0.5)
-            if time.time() - start_time > timeout:
-                raise RuntimeError("Server didn't start in time")
+            time.sleep(0.005)
+    raise RuntimeError("Server didn't start in time")
 
 
-def plot(df: pd.DataFrame, title: str, log=False):
+def plot(rows: list, title: str, log=False):
+    """
+    Args:
+        rows: `[(db_name, {"write": ..., "read": ...}), ...]`
+    """
     import matplotlib.pyplot as plt
 
-    # df.plot(kind="bar", figsize=(10, 7))
-    df.reset_index(inplace=True)
+    names = [db_name for db_name, _ in rows]
     plt.figure(figsize=(10, 6))
     write_color = '#ADD8E6'
     read_color = '#3EB489'
     bars_write = plt.bar(
-        df["index"],
-        df["write"],
+        names,
+        [info["write"] for _, info in rows],
         width=0.4,
         color=write_color,
         label='Write',
         align='center',
     )
     bars_read = plt.bar(
-        df["index"],
-        df["read"],
+        names,
+        [info["read"] for _, info in rows],
         width=0.4,
         color=read_color,
         label='Read',
@@ -53,14 +65,8 @@ def plot(df: pd.DataFrame, title: str, log=False):
     plt.xticks(rotation=20)
     plt.legend(title="Operation")
 
-    for bar in bars_write + bars_read:
-        yval = bar.get_height()
-        plt.text(
-            bar.get_x() + bar.get_width() / 2,
-            yval,
-            "{:.2e}".format(yval),
-            ha='center',
-            va='bottom',
-        )
+    ax = plt.gca()
+    ax.bar_label(bars_write, fmt='%.2e', padding=3)
+    ax.bar_label(bars_read, fmt='%.2e', padding=3)
 
     plt.show()
@@ -5,34 +5,45 @@ import shutil
 import subprocess
 
 import numpy as np
-import pandas as pd
 import pytest
 from dbclass import RedisDict, RocksDict, ShelveDict
 from helpers import plot, wait_for_server_to_start
 from rich import print
+from rich.table import Table
 from sparrow import MeasureTime  # pip install sparrow-python
 
 from flaxkv import FlaxKV
 from flaxkv._sqlite import SQLiteDict
 from flaxkv.core import BaseDBDict
+from flaxkv.pack import encode
 
 benchmark_info = {}
 
 N = 1500
+DIM = 1000
+DTYPE = np.float32  # half the bytes of float64 through every serialize/IO stage
+# exclude value serialization from the Redis write timing (network cost only)
+REDIS_PRE_ENCODE = False
+
+
+def prepare_data(n, dim=DIM, dtype=DTYPE, bytes_key=False):
+    """
+    Returns:
+        tuple: The keys and a (n, dim) matrix whose rows are the vectors.
+    """
+    if bytes_key:
+        keys = [f'vector-{i}'.encode() for i in range(n)]
+    else:
+        keys = [f'vector-{i}' for i in range(n)]
 
-
-def prepare_data(n, key_only=False):
-    global large_df
-
-    for i in range(n):
-        if key_only:
-            yield f'vector-{i}'
-        else:
-            yield (f'vector-{i}', np.random.rand(1000))
-            # yield (f'vector-{i}', large_df)
+    # one RNG call for all vectors, rows are views into the same buffer
+    mat = np.random.default_rng().random((n, dim), dtype=dtype)
+    return keys, mat
 
 
 def gen_large_df():
+    import pandas as pd
+
     global large_df
     num_rows = 100_000
     num_cols = 10
@@ -57,11 +68,15 @@ def startup_and_shutdown(request):
     def process_result():
         shutil.rmtree("FLAXKV_DB", ignore_errors=True)
         shutil.rmtree("SQLiteDB", ignore_errors=True)
-        df = pd.DataFrame(benchmark_info).T
-        df = df.sort_values(by="write", ascending=True)
-        print("\n", df)
-        title = f"Read and Write ({N=}) 1000-dim vectors"
-        plot(df, title, log=True)
+        rows = sorted(benchmark_info.items(), key=lambda kv: kv[1]["write"])
+        table = Table("db", "write", "read", "items")
+        for db_name, info in rows:
+            table.add_row(
+                db_name, *(f"{info[col]:.3e}" for col in ("write", "read", "items"))
+            )
+        print(table)
+        title = f"Read and Write ({N=}) {DIM}-dim {np.dtype(DTYPE).name} vectors"
+        plot(rows, title, log=True)
 
     request.addfinalizer(process_result)
 
@@ -106,12 +121,23 @@ def temp_db(request):
 
 def benchmark(db, db_name, n=200):
     print("\n--------------------------")
-    idx = 0
-    data = dict(prepare_data(n))
+    # redis-py would encode str keys on every call
+    keys, mat = prepare_data(n, bytes_key=isinstance(db, RedisDict))
+    data = dict(zip(keys, mat))
+    redis_pre_encode = REDIS_PRE_ENCODE and isinstance(db, RedisDict)
+    if redis_pre_encode:
+        raw_items = [(key, encode(value)) for key, value in data.items()]
     mt = MeasureTime().start()
-    for key, value in data.items():
-        idx += 1
-        db[key] = value
+    if redis_pre_encode:
+        db.bulk_set(raw_items, raw=True)
+    elif isinstance(db, RedisDict):
+        db.bulk_set(data.items())
+    elif hasattr(db, "update"):
+        db.update(data)
+    else:
+        setitem = db.__setitem__
+        for key, value in data.items():
+            setitem(key, value)
 
     if isinstance(db, BaseDBDict):
         db.write_immediately()
@@ -121,19 +147,27 @@ def benchmark(db, db_name, n=200):
         db.write_immediately(block=True)
 
     mt.start()
-    keys = []
-    for key in db.keys():
-        keys.append(key)
+    keys = tuple(db.keys())
     mt.show_interval(f"{db_name} read (keys only)")
 
+    getitem = db.__getitem__
     for key in keys:
-        value = db[key]
+        value = getitem(key)
     read_cost = float(mt.show_interval(f"{db_name} read (traverse elements) "))
+
+    mt.start()
+    for key, value in db.items():
+        pass
+    items_cost = float(mt.show_interval(f"{db_name} read (items)"))
     print("--------------------------")
-    return write_cost, read_cost
+    return write_cost, read_cost, items_cost
 
 
 def test_benchmark(temp_db):
     db, db_name = temp_db
-    write_cost, read_cost = benchmark(db, db_name=db_name, n=N)
-    benchmark_info[db_name] = {"write": write_cost, "read": read_cost}
+    write_cost, read_cost, items_cost = benchmark(db, db_name=db_name, n=N)
+    benchmark_info[db_name] = {
+        "write": write_cost,
+        "read": read_cost,
+        "items": items_cost,
+    }
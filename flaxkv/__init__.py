@@ -15,9 +15,10 @@
 
 from __future__ import annotations
 
-import re
+from typing import TYPE_CHECKING
 
-from .core import LevelDBDict, LMDBDict, RemoteDBDict
+if TYPE_CHECKING:
+    from .core import LevelDBDict, LMDBDict, RemoteDBDict
 
 __version__ = "0.2.9"
 
@@ -31,7 +32,11 @@ __all__ = [
     "RemoteDBDict",
 ]
 
-url_pattern = re.compile(r'^(http://|https://|ftp://)')
+# backend name -> class, or the class name in `.core` until first use
+_BACKENDS = {
+    "lmdb": "LMDBDict",
+    "leveldb": "LevelDBDict",
+}
 
 
 def FlaxKV(
@@ -43,7 +48,9 @@ def FlaxKV(
     cache=False,
     **kwargs,
 ) -> LMDBDict | LevelDBDict | RemoteDBDict:
-    if url_pattern.match(root_path_or_url):
+    if root_path_or_url.startswith(("http://", "https://", "ftp://")):
+        from .core import RemoteDBDict
+
         return RemoteDBDict(
             root_path_or_url=root_path_or_url,
             db_name=db_name,
@@ -54,30 +61,33 @@ def FlaxKV(
             **kwargs,
         )
 
-    if backend == 'lmdb':
-        return LMDBDict(
-            root_path=root_path_or_url,
-            db_name=db_name,
-            rebuild=rebuild,
-            raw=raw,
-            cache=cache,
-            **kwargs,
-        )
+    cls = _BACKENDS.get(backend)
+    if cls is None:
+        raise ValueError(f"Unsupported DB type {backend}.")
+    if isinstance(cls, str):
+        from . import core
 
-    elif backend == 'leveldb':
-        return LevelDBDict(
-            root_path=root_path_or_url,
-            db_name=db_name,
-            rebuild=rebuild,
-            raw=raw,
-            cache=cache,
-            **kwargs,
-        )
+        cls = _BACKENDS[backend] = getattr(core, cls)
 
-    else:
-        raise ValueError(f"Unsupported DB type {backend}.")
+    return cls(
+        root_path=root_path_or_url,
+        db_name=db_name,
+        rebuild=rebuild,
+        raw=raw,
+        cache=cache,
+        **kwargs,
+    )
 
 
 dbdict = FlaxKV
 dictdb = FlaxKV
 Flaxkv = FlaxKV
+
+
+def __getattr__(name):
+    # Backend classes are imported on first access
+    if name in ("LMDBDict", "LevelDBDict", "RemoteDBDict"):
+        from . import core
+
+        return getattr(core, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -12,42 +12,46 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import argparse
 import asyncio
 import os
-import platform
-
-import fire
-
-try:
-    import uvloop
-
-    uvloop.install()
-except:
-    ...
+import sys
+from importlib.util import find_spec
 
 
 class Cli:
     @staticmethod
-    def run(port=8000, **kwargs):
+    def run(port=8000, workers=1, **kwargs):
         """
         Runs the application using the Uvicorn server.
 
         Args:
             port (int): The port number on which to run the server. Default is 8000.
+            workers (int): The number of Uvicorn worker processes. Default is 1.
+                Each worker opens the databases on its own, so more than one worker
+                requires a backend that supports multi-process access (LMDB).
 
         Returns:
             None
         """
 
-        if platform.system() == "Windows":
+        if sys.platform.startswith("win"):
             os.environ["TZ"] = ""
 
         log_level = kwargs.get("log", "info")
         os.environ['FLAXKV_LOG_LEVEL'] = log_level.upper()
 
+        use_uvloop = find_spec("uvloop") is not None and not sys.platform.startswith(
+            "win"
+        )
+
         http2 = kwargs.get("http2", False)
         if http2:
             print("use http2")
+            if use_uvloop:
+                import uvloop
+
+                uvloop.install()
             from hypercorn.asyncio import serve
             from hypercorn.config import Config
 
@@ -63,7 +67,9 @@ class Cli:
                 app="flaxkv.serve.app:app",
                 host=kwargs.get("host", "0.0.0.0"),
                 port=port,
-                workers=1,
+                workers=workers,
+                loop="uvloop" if use_uvloop else "asyncio",
+                http="httptools" if find_spec("httptools") is not None else "h11",
                 app_dir="..",
                 ssl_keyfile=kwargs.get("ssl_keyfile", None),
                 ssl_certfile=kwargs.get("ssl_certfile", None),
@@ -73,7 +79,21 @@ class Cli:
 
 
 def main():
-    fire.Fire(Cli)
+    parser = argparse.ArgumentParser(prog="flaxkv")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = subparsers.add_parser("run", help="Run the FlaxKV server.")
+    run_parser.add_argument("--port", type=int, default=8000)
+    run_parser.add_argument("--host", default="0.0.0.0")
+    run_parser.add_argument("--workers", type=int, default=1)
+    run_parser.add_argument("--http2", action="store_true")
+    run_parser.add_argument("--log", default="info")
+    run_parser.add_argument("--ssl-keyfile", "--ssl_keyfile", dest="ssl_keyfile")
+    run_parser.add_argument("--ssl-certfile", "--ssl_certfile", dest="ssl_certfile")
+
+    args = vars(parser.parse_args())
+    command = args.pop("command")
+    getattr(Cli, command)(**args)
 
 
 if __name__ == "__main__":
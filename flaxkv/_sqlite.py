@@ -13,80 +13,145 @@
 # limitations under the License.
 
 
-import shutil
+import os
 import sqlite3
+import threading
+from pathlib import Path
 
 from .pack import decode, decode_key, encode
 
+_SQL_CREATE = "CREATE TABLE IF NOT EXISTS kv (key BLOB PRIMARY KEY, value BLOB)"
+_SQL_GET = "SELECT value FROM kv WHERE key=?"
+_SQL_PUT = "REPLACE INTO kv (key, value) VALUES (?, ?)"
+_SQL_DELETE = "DELETE FROM kv WHERE key=?"
+_SQL_DELETE_RETURNING = "DELETE FROM kv WHERE key=? RETURNING 1"
+_SQL_CONTAINS = "SELECT 1 FROM kv WHERE key=?"
+_SQL_COUNT = "SELECT COUNT(*) FROM kv"
+_SQL_KEYS = "SELECT key FROM kv"
+_SQL_VALUES = "SELECT value FROM kv"
+_SQL_ITEMS = "SELECT key, value FROM kv"
+_SQL_CLEAR = "DELETE FROM kv"
 
-class SQLiteDict:
-    from pathlib import Path
+_HAS_RETURNING = sqlite3.sqlite_version_info >= (3, 35, 0)
 
-    root_path = Path("./SQLiteDB")
-    if not root_path.exists():
-        root_path.mkdir(parents=True, exist_ok=True)
+_ROOT = Path("./SQLiteDB")
 
-    def __init__(self, filename=None):
 
-        self._filename = str(self.root_path / filename)
-        self._conn = self._connect(self._filename)
-        self._cursor = self._conn.cursor()
-        self._cursor.execute(
-            "CREATE TABLE IF NOT EXISTS kv (key BLOB PRIMARY KEY, value BLOB)"
+class SQLiteDict:
+    MAX_DIRTY = 1024  # unit: number of uncommitted writes
+    FETCH_SIZE = 256  # unit: number of rows fetched at a time while iterating
+    _root_ready = False
+
+    def __init__(self, filename=None, mmap_size=256 * 1024**2):
+        if not SQLiteDict._root_ready:
+            _ROOT.mkdir(parents=True, exist_ok=True)
+            SQLiteDict._root_ready = True
+
+        self._filename = str(_ROOT / filename)
+        self._dirty = 0
+        self._dirty_lock = threading.Lock()
+        self._conn = self._connect(self._filename, mmap_size=mmap_size)
+        self._conn.execute(_SQL_CREATE)
+        self._conn.commit()
+        # iteration reads through its own connection: under WAL each statement
+        # sees a snapshot, so rows written while iterating are not yielded
+        self._reader = sqlite3.connect(
+            f"file:{self._filename}?mode=ro",
+            uri=True,
+            check_same_thread=False,
+            isolation_level=None,
         )
+        self._reader.execute(f"PRAGMA mmap_size={int(mmap_size)}")
 
-    def _connect(self, filename):
+    def _connect(self, filename, mmap_size=256 * 1024**2):
         if filename:
-            return sqlite3.connect(filename)
+            conn = sqlite3.connect(
+                filename, check_same_thread=False, isolation_level="DEFERRED"
+            )
         else:
-            return sqlite3.connect(':memory:')
+            conn = sqlite3.connect(
+                ':memory:', check_same_thread=False, isolation_level="DEFERRED"
+            )
+        # page_size only applies to a new database and must be set before WAL
+        conn.execute("PRAGMA page_size=8192")
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("PRAGMA temp_store=MEMORY")
+        conn.execute("PRAGMA cache_size=-65536")
+        conn.execute(f"PRAGMA mmap_size={int(mmap_size)}")
+        return conn
 
     def _commit(self):
+        with self._dirty_lock:
+            self._dirty = 0
         self._conn.commit()
 
-    def __setitem__(self, key, value):
-        key = encode(key)
-        value = encode(value)
-        self._cursor.execute("REPLACE INTO kv (key, value) VALUES (?, ?)", (key, value))
+    def _mark_dirty(self):
+        with self._dirty_lock:
+            self._dirty += 1
+            if self._dirty < self.MAX_DIRTY:
+                return
+            self._dirty = 0
         self._conn.commit()
 
+    def __setitem__(self, key, value):
+        self._conn.execute(_SQL_PUT, (encode(key), encode(value)))
+        self._mark_dirty()
+
     def __getitem__(self, key):
-        key = encode(key)
-        self._cursor.execute("SELECT value FROM kv WHERE key=?", (key,))
-        result = self._cursor.fetchone()
+        result = self._conn.execute(_SQL_GET, (encode(key),)).fetchone()
         if result:
             return decode(result[0])
         raise KeyError(f"'{key}' not found in database")
 
     def __delitem__(self, key):
-        key = encode(key)
-        if key not in self:
+        if _HAS_RETURNING:
+            cursor = self._conn.execute(_SQL_DELETE_RETURNING, (encode(key),))
+            deleted = cursor.fetchone() is not None
+        else:
+            cursor = self._conn.execute(_SQL_DELETE, (encode(key),))
+            deleted = cursor.rowcount > 0
+        if not deleted:
             raise KeyError(f"'{key}' not found in database")
-        self._cursor.execute("DELETE FROM kv WHERE key=?", (key,))
+        self._mark_dirty()
 
     def __contains__(self, key):
-        key = encode(key)
-        self._cursor.execute("SELECT 1 FROM kv WHERE key=?", (key,))
-        return bool(self._cursor.fetchone())
+        return bool(self._conn.execute(_SQL_CONTAINS, (encode(key),)).fetchone())
 
     def __len__(self):
-        self._cursor.execute("SELECT COUNT(*) FROM kv")
-        return self._cursor.fetchone()[0]
+        return self._conn.execute(_SQL_COUNT).fetchone()[0]
+
+    def _iter_rows(self, sql):
+        """
+        Streams the rows of a query from the read-only connection.
+        """
+        if self._conn.in_transaction:
+            # the reader only sees committed rows
+            self._commit()
+        cursor = self._reader.execute(sql)
+        try:
+            while True:
+                rows = cursor.fetchmany(self.FETCH_SIZE)
+                if not rows:
+                    return
+                yield from rows
+        finally:
+            cursor.close()
 
     def keys(self):
-        self._cursor.execute("SELECT key FROM kv")
-        return [decode_key(row[0]) for row in self._cursor.fetchall()]
+        return list(iter(self))
 
     def values(self):
-        self._cursor.execute("SELECT value FROM kv")
-        return [decode(row[0]) for row in self._cursor.fetchall()]
+        for (value,) in self._iter_rows(_SQL_VALUES):
+            yield decode(value)
 
     def items(self):
-        self._cursor.execute("SELECT key, value FROM kv")
-        return [(decode_key(row[0]), decode(row[1])) for row in self._cursor.fetchall()]
+        for key, value in self._iter_rows(_SQL_ITEMS):
+            yield decode_key(key), decode(value)
 
     def __iter__(self):
-        return iter(self.keys())
+        for (key,) in self._iter_rows(_SQL_KEYS):
+            yield decode_key(key)
 
     def close_conn_and_cursor(self):
         try:
@@ -94,11 +159,16 @@ class SQLiteDict:
         except:
             ...
         try:
-            self._cursor.close()
+            self._reader.close()
         except:
             ...
 
     def close(self):
+        try:
+            self._commit()
+        except sqlite3.ProgrammingError:
+            # already closed
+            ...
         self.close_conn_and_cursor()
 
     def __enter__(self):
@@ -113,31 +183,27 @@ class SQLiteDict:
             self.close()
 
     def __del__(self):
-        self.close_conn_and_cursor()
-        if self._filename:
-            shutil.rmtree(self._filename, ignore_errors=True)
+        self.close()
 
     def clear(self):
         """Remove all items from the database."""
-        self._cursor.execute("DELETE FROM kv")
-        self._conn.commit()
+        self._conn.execute(_SQL_CLEAR)
+        self._commit()
 
     def update(self, E):
         if not isinstance(E, dict):
             raise ValueError("Input must be a dictionary.")
 
-        # Start a transaction
-        self._cursor.execute("BEGIN TRANSACTION")
+        if self._conn.in_transaction:
+            # flush deferred writes so that a rollback below cannot drop them
+            self._commit()
         try:
-            # Convert the dictionary items to a list of serialized items
-            serialized_items = [
-                (encode(key), encode(value)) for key, value in E.items()
-            ]
-            # Use executemany to efficiently insert multiple rows
-            self._cursor.executemany(
-                "REPLACE INTO kv (key, value) VALUES (?, ?)", serialized_items
+            # Stream serialized items into executemany, sqlite3 opens the
+            # transaction implicitly
+            self._conn.executemany(
+                _SQL_PUT, ((encode(key), encode(value)) for key, value in E.items())
             )
-            self._conn.commit()  # Commit the transaction
+            self._commit()  # Commit the transaction
         except:
             self._conn.rollback()  # Rollback in case of any exception
             raise  # Re-raise the exception
@@ -146,4 +212,10 @@ class SQLiteDict:
         return str(dict(self.items()))
 
     def destroy(self):
-        self.__del__()
+        self.close()
+        if self._filename:
+            for suffix in ("", "-wal", "-shm", "-journal"):
+                try:
+                    os.unlink(self._filename + suffix)
+                except FileNotFoundError:
+                    pass
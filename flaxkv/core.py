@@ -16,31 +16,66 @@
 from __future__ import annotations
 
 import atexit
+import os
 import threading
 import time
-import traceback
 from abc import ABC, abstractmethod
 from dataclasses import dataclass
 from typing import TYPE_CHECKING, Any, Optional, Type, TypeVar
 
-import numpy as np
 from loguru import logger
 
 from .decorators import class_measure_time
-from .helper import SimpleQueue
+from .helper import prefetch
 from .log import setting_log
 from .manager import DBManager, RemoteTransaction
-from .pack import check_pandas_type, decode, decode_key, encode
+from .pack import (
+    decode,
+    decode_batch,
+    decode_key,
+    decode_key_batch,
+    encode,
+    msg_encoder,
+    unpack_items,
+)
 
 if TYPE_CHECKING:
     from httpx import Response
     from litestar.exceptions import HTTPException
 
+# `buffer_dict` value of a key deleted since the last flush
+_DELETED = object()
+_MISS = object()
+
+_instances_lock = threading.Lock()
+
+
+def _get_instance(cls, db_name, root_path):
+    """
+    Returns the instance of `cls` for the database, creating it on first use.
+    Aliases of the same directory (relative, absolute, symlinked) share one instance.
+    """
+    key = (db_name, os.path.realpath(root_path))
+    instance = cls._instances.get(key)
+    if instance is None:
+        with _instances_lock:
+            instance = cls._instances.get(key)
+            if instance is None:
+                instance = cls._instances[key] = object.__new__(cls)
+    return instance
+
 
 class BaseDBDict(ABC):
     MAX_BUFFER_SIZE = 100  # unit: number of keys
+    # the flush threshold adapts between MAX_BUFFER_SIZE and
+    # MAX_BUFFER_SIZE * MAX_BUFFER_SCALE keys
+    MAX_BUFFER_SCALE = 16
+    FLUSH_TIME_RANGE = (0.05, 0.5)  # grow / shrink the flush threshold, unit: second
     COMMIT_TIME_INTERVAL = 10 * 60  # unit: second
     _logger = logger
+    # number of keys in the db for backends that cannot count cheaply, counted on
+    # the first `stat()` and then kept by each flush
+    _db_count = None
 
     # Unused
     @dataclass
@@ -100,28 +135,43 @@ class BaseDBDict(ABC):
         )
         self._db_name = self._db_manager.db_name
         self._raw = raw
+        if not raw:
+            # Resolve the codec once: the hot paths call the msgspec encoder
+            # directly instead of going through two Python-level wrappers.
+            self._encode_key = self._encode_value = msg_encoder.encode
         self._cache_all_db = cache
         self._register_auto_close()
         self._init()
 
     def _init(self):
         self._static_view = self._db_manager.new_static_view()
+        # the db may have been rebuilt, count it again when needed
+        self._db_count = None
 
+        # pending writes, a deleted key maps to `_DELETED`
         self.buffer_dict = {}
+        # the buffer being written by the background worker, still visible to readers
+        self._flushing_dict = {}
         self._stat_buffer_num = 0
-        self.delete_buffer_set = set()
+        self._marked_delete_num = 0
 
         self._buffered_count = 0
+        self._buffer_scale = 1
         self._buffer_lock = threading.Lock()
 
         self._stop_event = threading.Event()
 
         self._last_set_time = None
+        # wakes the write monitor when a write arrives after an idle period
+        self._set_cv = threading.Condition()
 
-        self._write_complete = SimpleQueue(maxsize=1)
-        self._write_event = threading.Event()
         self._latest_write_num = 0
-        self._write_queue = SimpleQueue(maxsize=1)
+        # write requests and completions are counted under a single condition,
+        # a blocking caller waits until a write that started after its request ends
+        self._write_cv = threading.Condition()
+        self._write_requested = 0
+        self._write_done = 0
+        self._skip_write = False
         self._thread_running = True
 
         self._thread = threading.Thread(target=self._background_worker)
@@ -158,103 +208,93 @@ class BaseDBDict(ABC):
         self._thread.start()
         self._thread_write_monitor.start()
 
-    @staticmethod
-    def _diff_buffer(a: dict, b: dict):
-        """
-        Computes the difference between two buffers.
-        Find a dictionary containing key-value pairs that exist in `a` but not in `b`.
-        Args:
-            a (dict): The latest buffer.
-            b (dict): The older buffer.
-
-        Q: Why don't you need to worry about the key-value pair existing in 'b' but not in 'a'?
-        A: Because the absence of the key in 'a' indicates that the value has been deleted by the user,
-           and this information will be stored in the 'deleted_set'.
-
-
-        Returns:
-            dict: A dictionary containing key-value pairs that exist in `a` but not in `b`.
-        """
-        result = {}
-        for key, value in a.items():
-            if key not in b:
-                result[key] = value
-            else:
-                if type(value) is not type(b[key]):
-                    continue
-                if isinstance(value, np.ndarray):
-                    if not np.array_equal(value, b[key]):
-                        result[key] = value
-                elif check_pandas_type(value):
-                    if not value.equals(b[key]):
-                        result[key] = value
-                else:
-                    if value != b[key]:
-                        result[key] = value
-        return result
-
     def _write_monitor(self):
         self._logger.info("Write monitor started")
-        while not self._stop_event.is_set():
-            time.sleep(0.2)
-            if self._last_set_time is not None:
-                if (time.time() - self._last_set_time) >= 0.6:
-                    self._logger.debug("Write monitor triggered")
-                    self.write_immediately()
+        while True:
+            with self._set_cv:
+                # the stop flag and the last set time are only read under the
+                # condition, so a notify can never slip in before the wait
+                if self._stop_event.is_set():
+                    break
+                last_set_time = self._last_set_time
+                if last_set_time is None:
+                    # idle until the next write
+                    self._set_cv.wait()
+                    continue
+                delay = last_set_time + 0.6 - time.time()
+                if delay > 0:
+                    self._set_cv.wait(timeout=delay)
+                    continue
+            self._logger.debug("Write monitor triggered")
+            self.write_immediately()
 
     def _background_worker(self):
         """
         Background worker function to periodically write buffer to the database.
         """
-        while self._thread_running or not self._write_queue.empty():
-
-            self._write_event.wait(timeout=self.COMMIT_TIME_INTERVAL)
-            self._write_event.clear()
-
-            if not self._write_queue.empty():
-                is_write = self._write_queue.get()
-                if is_write is False:
-                    self._write_complete.put(True)
-                    break
-
-            self._write_complete.clear()
-
-            try:
-                self._write_buffer_to_db(current_write_num=self._latest_write_num)
-
-            except:
-                # todo:
-                self._logger.warning(f"Write buffer to db failed. error")
-                traceback.print_exc()
-
-            self._write_complete.put(True)
+        while True:
+            with self._write_cv:
+                if self._thread_running and self._write_requested == self._write_done:
+                    self._write_cv.wait(timeout=self.COMMIT_TIME_INTERVAL)
+                target = self._write_requested
+                running = self._thread_running
+                skip_write = self._skip_write
+
+            if not skip_write:
+                try:
+                    self._write_buffer_to_db(current_write_num=self._latest_write_num)
+                except Exception:
+                    self._logger.exception("Write buffer to db failed")
+
+            with self._write_cv:
+                self._write_done = target
+                self._write_cv.notify_all()
+
+            if not running:
+                break
 
     def write_immediately(self, write=True, block=False):
         """
         Triggers an immediate write of the buffer to the database.
         """
-        self._last_set_time = None
+        with self._set_cv:
+            self._last_set_time = None
         self._latest_write_num += 1
-        self._write_queue.put(write)
-        self._write_event.set()
-        if block:
-            self._write_complete.clear()
-            self._write_complete.get(block=True)
+        with self._write_cv:
+            if not write:
+                # stop the worker without writing the buffer
+                self._skip_write = True
+                self._thread_running = False
+            self._write_requested += 1
+            target = self._write_requested
+            self._write_cv.notify_all()
+            if block:
+                self._write_cv.wait_for(
+                    lambda: self._write_done >= target or not self._thread.is_alive()
+                )
 
     def wait_until_write_complete(self, timeout=None):
         """
         Waits until the background worker thread has finished writing the buffer to the database.
         """
-        self._write_complete.get(block=True, timeout=timeout)
+        with self._write_cv:
+            self._write_cv.wait_for(
+                lambda: self._write_done >= self._write_requested
+                or not self._thread.is_alive(),
+                timeout=timeout,
+            )
 
     def _close_background_worker(self, write=True, block=False):
         """
         Stops the background worker thread.
         """
         self._stop_event.set()
+        with self._set_cv:
+            self._set_cv.notify()
         self._latest_write_num += 1
 
-        self._thread_running = False
+        with self._write_cv:
+            self._thread_running = False
 
         self.write_immediately(write=write, block=block)
 
@@ -288,14 +328,21 @@ class BaseDBDict(ABC):
         Returns:
             value: The value associated with the key, or None if the key is not found.
         """
+        # Lock-free fast path: the buffers hold deletes as `_DELETED`, and a flush
+        # publishes its snapshot as `_flushing_dict` before it empties `buffer_dict`,
+        # so each probe (atomic under the GIL) is a consistent read.
+        value = self._get_buffered(key)
+        if value is _DELETED:
+            return default
+        if value is not _MISS:
+            return value
+
         with self._buffer_lock:
-            if key in self.delete_buffer_set:
-                self.delete_buffer_set.discard(key)
-                self.buffer_dict[key] = default
+            value = self._get_buffered(key)
+            if value is _DELETED:
                 return default
-
-            if key in self.buffer_dict:
-                return self.buffer_dict[key]
+            if value is not _MISS:
+                return value
 
             if self._cache_all_db:
                 return self._cache_dict.get(key, default)
@@ -304,13 +351,24 @@ class BaseDBDict(ABC):
             value = self._static_view.get(_encode_key)
 
             if value is None:
-                self.buffer_dict[key] = default
                 return default
 
             v = value if self._raw else decode(value)
             self.buffer_dict[key] = v
             return v
 
+    def _get_buffered(self, key):
+        """
+        Looks up a key in the write buffer, then in the buffer being flushed.
+
+        Returns:
+            The buffered value, `_DELETED`, or `_MISS` if the key is not buffered.
+        """
+        value = self.buffer_dict.get(key, _MISS)
+        if value is _MISS:
+            value = self._flushing_dict.get(key, _MISS)
+        return value
+
     def get_db_value(self, key: str):
         """
         Directly retrieves the encoded value associated with the given key from the database.
@@ -334,25 +392,85 @@ class BaseDBDict(ABC):
         Returns:
             list: A list of values corresponding to the given keys.
         """
-        values = []
-        for key in keys:
-            if self.delete_buffer_set and key in self.delete_buffer_set:
-                values.append(None)
-                continue
-            if key in self.buffer_dict:
-                values.append(self.buffer_dict[key])
-                continue
+        keys = list(keys)
+        values = [None] * len(keys)
+        pending = []  # (index, encoded key) of the keys that must be read from db
+        view = None
+        with self._buffer_lock:
+            for idx, key in enumerate(keys):
+                value = self._get_buffered(key)
+                if value is _DELETED:
+                    continue
+                if value is not _MISS:
+                    values[idx] = value
+                elif self._cache_all_db:
+                    values[idx] = self._cache_dict.get(key)
+                else:
+                    pending.append((idx, self._encode_key(key)))
+            if pending:
+                view = self._db_manager.new_static_view()
 
-            if self._cache_all_db:
-                value = self._cache_dict.get(key)
-            else:
-                key = self._encode_key(key)
-                value = self._static_view.get(key)
+        if pending:
+            try:
+                db_values = self._get_multi_from_view(
+                    view, sorted({key for _, key in pending})
+                )
+            finally:
+                self._db_manager.close_static_view(view)
+            for idx, key in pending:
+                value = db_values.get(key)
                 if value is not None:
-                    value = decode(value)
-            values.append(value)
+                    values[idx] = value if self._raw else decode(value)
         return values
 
+    def _get_multi_from_view(self, view, keys):
+        """
+        Looks up a batch of encoded keys in the database view.
+
+        Args:
+            view: The database view to read from.
+            keys (list): Sorted encoded keys.
+
+        Returns:
+            dict: The raw values of the keys that exist, keyed by encoded key.
+        """
+        result = {}
+        for key in keys:
+            value = view.get(key)
+            if value is not None:
+                result[key] = value
+        return result
+
+    def _count_writes(self, num=1):
+        """
+        Counts buffered writes. Must be called with the buffer lock held.
+
+        Returns:
+            bool: True if the flush threshold has been reached, the count is reset
+            so that only one writer triggers the flush.
+        """
+        self._buffered_count += num
+        if self._buffered_count >= self.MAX_BUFFER_SIZE * self._buffer_scale:
+            self._buffered_count = 0
+            return True
+        return False
+
+    def _maybe_flush(self, flush=False):
+        """
+        Records the time of the last write and triggers an immediate write
+        if the flush threshold was reached.
+
+        Args:
+            flush (bool): The result of `_count_writes`.
+        """
+        with self._set_cv:
+            if self._last_set_time is None:
+                self._set_cv.notify()
+            self._last_set_time = time.time()
+        if flush:
+            self._logger.debug("Trigger immediate write")
+            self.write_immediately()
+
     def _set(self, key, value):
         """
         Sets the value for a given key in the buffer.
@@ -362,17 +480,24 @@ class BaseDBDict(ABC):
             value: The value to associate with the key.
         """
         with self._buffer_lock:
-            self.buffer_dict[key] = value
-            self.delete_buffer_set.discard(key)
-            self._stat_buffer_num = len(self.buffer_dict)
-
-            self._buffered_count += 1
-        self._last_set_time = time.time()
-        # Trigger immediate write if buffer size exceeds MAX_BUFFER_SIZE
-        if self._buffered_count >= self.MAX_BUFFER_SIZE:
-            self._logger.debug("Trigger immediate write")
-            self._buffered_count = 0
-            self.write_immediately()
+            flush = self._set_locked(key, value)
+        self._maybe_flush(flush)
+
+    def _set_locked(self, key, value):
+        """
+        Sets the value for a given key in the buffer. Must be called with the buffer lock held.
+
+        Returns:
+            bool: Whether the flush threshold has been reached.
+        """
+        # only probe for a pending delete when there is one
+        if self._marked_delete_num and self.buffer_dict.get(key) is _DELETED:
+            self._marked_delete_num -= 1
+        self.buffer_dict[key] = value
+        self._stat_buffer_num = (
+            len(self.buffer_dict) + len(self._flushing_dict) - self._marked_delete_num
+        )
+        return self._count_writes()
 
     def setdefault(self, key, default=None):
         """
@@ -385,12 +510,23 @@ class BaseDBDict(ABC):
         Returns:
             value: The value associated with the key.
         """
-        value = self.get(key)
-        if value is None:
-            self._set(key, default)
-            return default
-
-        return value
+        with self._buffer_lock:
+            # look up and set under one lock acquisition
+            value = self._get_buffered(key)
+            if value is _DELETED:
+                value = None
+            elif value is _MISS:
+                if self._cache_all_db:
+                    value = self._cache_dict.get(key)
+                else:
+                    value = self._static_view.get(self._encode_key(key))
+                    if value is not None and not self._raw:
+                        value = decode(value)
+            if value is not None:
+                return value
+            flush = self._set_locked(key, default)
+        self._maybe_flush(flush)
+        return default
 
     def update(self, d: dict):
         """
@@ -401,22 +537,25 @@ class BaseDBDict(ABC):
         """
         if not isinstance(d, dict):
             raise ValueError("Input must be a dictionary.")
+        items = d.items()
+        if self._raw:
+            # encode outside the lock
+            items = [(encode(key), encode(value)) for key, value in items]
         with self._buffer_lock:
-            for key, value in d.items():
-                if self._raw:
-                    key, value = encode(key), encode(value)
-                self.buffer_dict[key] = value
-                self.delete_buffer_set.discard(key)
-
-            self._stat_buffer_num = len(self.buffer_dict)
-            self._buffered_count += len(d)
+            buffer_dict = self.buffer_dict
+            for key, value in items:
+                if self._marked_delete_num and buffer_dict.get(key) is _DELETED:
+                    self._marked_delete_num -= 1
+                buffer_dict[key] = value
+
+            self._stat_buffer_num = (
+                len(self.buffer_dict)
+                + len(self._flushing_dict)
+                - self._marked_delete_num
+            )
+            flush = self._count_writes(len(d))
 
-        self._last_set_time = time.time()
-        # Trigger immediate write if buffer size exceeds MAX_BUFFER_SIZE
-        if self._buffered_count >= self.MAX_BUFFER_SIZE:
-            self._logger.debug("Trigger immediate write")
-            self._buffered_count = 0
-            self.write_immediately()
+        self._maybe_flush(flush)
 
     def from_dict(self, d: dict, clear=False):
         """
@@ -443,52 +582,144 @@ class BaseDBDict(ABC):
         with self._buffer_lock:
             self._logger.debug(f"Trigger write")
             self._logger.debug(f"{current_write_num=}")
-            if not (self.buffer_dict or self.delete_buffer_set):
+            if not self.buffer_dict:
                 self._logger.debug(
-                    f"buffer is empty and delete_buffer_set is empty: {self._latest_write_num=} {current_write_num=}"
+                    f"buffer is empty: {self._latest_write_num=} {current_write_num=}"
                 )
                 return
             else:
-                # ensure atomicity (shallow copy)
-                buffer_dict_snapshot = self.buffer_dict.copy()
-                delete_buffer_set_snapshot = self.delete_buffer_set.copy()
-                cache_dict = self._cache_dict.copy()
-        # ensure atomicity
-        with self._db_manager.write() as wb:
-            try:
-                for key in delete_buffer_set_snapshot:
-                    # delete from db
-                    key = self._encode_key(key)
-                    wb.delete(key)
-                for key, value in buffer_dict_snapshot.items():
-                    # set key, value to cache
-                    if self._cache_all_db:
-                        cache_dict[key] = value
-
-                    # set key, value to db
-                    key, value = self._encode_key(key), self._encode_value(value)
-                    wb.put(key, value)
-
-            except Exception as e:
-                traceback.print_exc()
-                self._logger.error(
-                    f"Error writing to {self._db_manager.db_type}: {e}\n"
-                    f"data will rollback"
+                # ensure atomicity: swap in an empty buffer, writes made from now on
+                # land there and are left for the next flush
+                buffer_dict_snapshot = self.buffer_dict
+                self._flushing_dict = buffer_dict_snapshot
+                self.buffer_dict = {}
+        start_time = time.perf_counter()
+        try:
+            # Encode before opening the write transaction: LMDB allows a single
+            # writer, so the transaction should only copy bytes.
+            encoded_delete_keys = []
+            encoded_items = []
+            for key, value in buffer_dict_snapshot.items():
+                if value is _DELETED:
+                    encoded_delete_keys.append(self._encode_key(key))
+                else:
+                    encoded_items.append(
+                        (self._encode_key(key), self._encode_value(value))
+                    )
+            db_count_delta = None
+            if self._db_count is not None:
+                db_count_delta = self._db_count_delta(
+                    encoded_delete_keys, encoded_items
                 )
-                raise
+
+            # ensure atomicity
+            with self._db_manager.write() as wb:
+                # delete from db
+                self._delete_keys(wb, encoded_delete_keys)
+                # set key, value to db
+                self._put_items(wb, encoded_items)
+        except Exception as e:
+            # the transaction has been rolled back, the traceback is left to the caller
+            self._logger.error(
+                f"Error writing to {self._db_manager.db_type}: {e}\n"
+                f"data will rollback"
+            )
+            with self._buffer_lock:
+                # put the snapshot back under the writes made while flushing
+                for key, value in buffer_dict_snapshot.items():
+                    if key not in self.buffer_dict:
+                        self.buffer_dict[key] = value
+                    elif value is _DELETED:
+                        self._marked_delete_num -= 1
+                self._flushing_dict = {}
+            raise
+        self._adapt_buffer_scale(
+            len(buffer_dict_snapshot), time.perf_counter() - start_time
+        )
 
         with self._buffer_lock:
-            self.delete_buffer_set = self.delete_buffer_set - delete_buffer_set_snapshot
-            self.buffer_dict = self._diff_buffer(self.buffer_dict, buffer_dict_snapshot)
-            self._cache_dict = cache_dict
+            if self._cache_all_db:
+                # update the cache in place, O(len(snapshot)) instead of a full copy
+                cache_dict = self._cache_dict
+                for key, value in buffer_dict_snapshot.items():
+                    if value is _DELETED:
+                        cache_dict.pop(key, None)
+                    else:
+                        cache_dict[key] = value
 
             self._db_manager.close_static_view(self._static_view)
             self._static_view = self._db_manager.new_static_view()
+            # only drop the snapshot once the new view can serve its keys
+            self._flushing_dict = {}
+            self._marked_delete_num -= len(encoded_delete_keys)
+            if self._db_count is not None:
+                # counted while this flush was running, count again on the next `stat()`
+                self._db_count = (
+                    None if db_count_delta is None else self._db_count + db_count_delta
+                )
             self._logger.info(
                 f"write {self._db_manager.db_type.upper()} buffer to db successfully! "
                 f"current_num={current_write_num} latest_num={self._latest_write_num}"
             )
-            self._stat_buffer_num = len(self.buffer_dict)
+            self._stat_buffer_num = len(self.buffer_dict) - self._marked_delete_num
+
+    def _db_count_delta(self, encoded_delete_keys, encoded_items):
+        """
+        Computes how a flush changes the number of keys in the db, by looking
+        the keys up in the static view taken after the previous flush.
+
+        Returns:
+            int: Number of new keys minus number of deleted existing keys.
+        """
+        view = self._static_view
+        delta = 0
+        for key in encoded_delete_keys:
+            if view.get(key) is not None:
+                delta -= 1
+        for key, _ in encoded_items:
+            if view.get(key) is None:
+                delta += 1
+        return delta
+
+    def _delete_keys(self, wb, keys):
+        """
+        Deletes encoded keys within the write transaction.
+
+        Args:
+            wb: The write transaction or batch.
+            keys (list): A list of encoded keys.
+        """
+        for key in keys:
+            wb.delete(key)
+
+    def _put_items(self, wb, items):
+        """
+        Writes encoded key-value pairs within the write transaction.
+
+        Args:
+            wb: The write transaction or batch.
+            items (list): A list of (encoded key, encoded value) pairs.
+        """
+        for key, value in items:
+            wb.put(key, value)
+
+    def _adapt_buffer_scale(self, write_num, write_time):
+        """
+        Adjusts the flush threshold to the measured write time: a full buffer that
+        is written quickly means the per-transaction overhead dominates, so the next
+        batches are allowed to grow; a slow write shrinks them back.
+
+        Args:
+            write_num (int): Number of keys written.
+            write_time (float): Time spent encoding and writing them, in seconds.
+        """
+        fast, slow = self.FLUSH_TIME_RANGE
+        if write_time > slow:
+            self._buffer_scale = max(self._buffer_scale // 2, 1)
+        elif (
+            write_time < fast and write_num >= self.MAX_BUFFER_SIZE * self._buffer_scale
+        ):
+            self._buffer_scale = min(self._buffer_scale * 2, self.MAX_BUFFER_SCALE)
 
     def __iter__(self):
         """
@@ -507,8 +738,8 @@ class BaseDBDict(ABC):
             value: The value associated with the key.
         """
 
-        value = self.get(key, b'iamnone')
-        if isinstance(value, bytes) and value == b'iamnone':
+        value = self.get(key, _MISS)
+        if value is _MISS:
             raise KeyError(f"Key `{key}` not found in the database.")
         return value
 
@@ -529,22 +760,22 @@ class BaseDBDict(ABC):
         Args:
             key: The key to delete.
         """
-        if key in self:
-            with self._buffer_lock:
-                self.delete_buffer_set.add(key)
-                self._buffered_count += 1
-                self._last_set_time = time.time()
-                if key in self.buffer_dict:
-                    del self.buffer_dict[key]
-                    # If it is in the buffer (possibly obtained through get), then _stat_buffer_num -= 1,
-                    # and _stat_buffer_num can be negative
-                    self._stat_buffer_num -= 1
-                    return
-                else:
-                    if self._cache_all_db:
-                        self._cache_dict.pop(key)
-        else:
-            raise KeyError(f"Key `{key}` not found in the database.")
+        with self._buffer_lock:
+            value = self._get_buffered(key)
+            if value is _DELETED:
+                raise KeyError(f"Key `{key}` not found in the database.")
+            elif value is not _MISS:
+                # If it is in the buffer (possibly obtained through get), then _stat_buffer_num -= 1,
+                # and _stat_buffer_num can be negative
+                self._stat_buffer_num -= 1
+            elif self._cache_all_db:
+                if self._cache_dict.pop(key, _MISS) is _MISS:
+                    raise KeyError(f"Key `{key}` not found in the database.")
+            elif self._static_view.get(self._encode_key(key)) is None:
+                raise KeyError(f"Key `{key}` not found in the database.")
+
+            flush = self._mark_deleted(key)
+        self._maybe_flush(flush)
 
     def pop(self, key, default=None):
         """
@@ -557,27 +788,38 @@ class BaseDBDict(ABC):
         Returns:
             value: The value associated with the key, or the default value.
         """
-        if key in self:
-            with self._buffer_lock:
-                self.delete_buffer_set.add(key)
-                self._buffered_count += 1
-                self._last_set_time = time.time()
-                if key in self.buffer_dict:
-                    value = self.buffer_dict.pop(key)
-                    self._stat_buffer_num -= 1
-                    if self._raw:
-                        return decode(value)
-                    else:
-                        return value
-                else:
-                    if self._cache_all_db:
-                        value = self._cache_dict.pop(key)
-                    else:
-                        key = self._encode_key(key)
-                        value = decode(self._static_view.get(key))
-                    return value
-        else:
-            return default
+        with self._buffer_lock:
+            value = self._get_buffered(key)
+            if value is _DELETED:
+                return default
+            elif value is not _MISS:
+                self._stat_buffer_num -= 1
+                if self._raw:
+                    value = decode(value)
+            elif self._cache_all_db:
+                value = self._cache_dict.pop(key, _MISS)
+                if value is _MISS:
+                    return default
+            else:
+                value = self._static_view.get(self._encode_key(key))
+                if value is None:
+                    return default
+                value = decode(value)
+
+            flush = self._mark_deleted(key)
+        self._maybe_flush(flush)
+        return value
+
+    def _mark_deleted(self, key):
+        """
+        Marks a key as deleted in the buffer. Must be called with the buffer lock held.
+
+        Returns:
+            bool: Whether the flush threshold has been reached.
+        """
+        self.buffer_dict[key] = _DELETED
+        self._marked_delete_num += 1
+        return self._count_writes()
 
     def __contains__(self, key):
         """
@@ -589,12 +831,14 @@ class BaseDBDict(ABC):
         Returns:
             bool: True if the key exists, False otherwise.
         """
-        with self._buffer_lock:
-            if key in self.buffer_dict:
-                return True
+        value = self._get_buffered(key)
+        if value is not _MISS:
+            return value is not _DELETED
 
-            if key in self.delete_buffer_set:
-                return False
+        with self._buffer_lock:
+            value = self._get_buffered(key)
+            if value is not _MISS:
+                return value is not _DELETED
 
             if self._cache_all_db:
                 return key in self._cache_dict
@@ -649,62 +893,67 @@ class BaseDBDict(ABC):
         self._db_manager.close()
         self._logger.info(f"Closed ({self._db_manager.db_type.upper()}) successfully")
 
-    def _get_status_info(
-        self,
-        return_key=False,
-        return_value=False,
-        return_buffer_dict=False,
-        return_view=True,
-        decode_raw=True,
-    ):
-        static_view = None
-        buffer_keys_set, buffer_values_list = None, None
+    def _get_buffer_snapshot(self, return_view=False, decode_raw=True, keys_only=False):
+        """
+        Takes a consistent snapshot of the pending writes, and optionally a new view of the db.
 
-        # shallow copy buffer data
+        Args:
+            return_view (bool): Whether to open a new static view along with the snapshot.
+            decode_raw (bool): Whether to decode the buffered data of a raw instance.
+            keys_only (bool): Whether only the keys of the pending sets are needed.
+
+        Returns:
+            tuple: (buffer, delete_buffer_set, view). `buffer` is a dict of the pending sets,
+            or a set of their keys with `keys_only`; `view` is None unless requested, and a
+            copy of `_cache_dict` when the whole db is cached.
+        """
+        view = None
         with self._buffer_lock:
             if return_view:
-                static_view = self._db_manager.new_static_view()
+                if self._cache_all_db:
+                    # flushes update the cache in place, iterate a copy of it instead
+                    view = self._cache_dict.copy()
+                else:
+                    view = self._db_manager.new_static_view()
             buffer_dict = self.buffer_dict.copy()
-            delete_buffer_set = self.delete_buffer_set.copy()
+            if self._flushing_dict:
+                buffer_dict = {**self._flushing_dict, **buffer_dict}
 
-        if self._raw and decode_raw:
+        delete_buffer_set = {
+            key for key, value in buffer_dict.items() if value is _DELETED
+        }
+        if delete_buffer_set:
+            buffer_dict = {
+                key: value
+                for key, value in buffer_dict.items()
+                if value is not _DELETED
+            }
+
+        decode_keys = self._raw and decode_raw
+        if decode_keys:
             delete_buffer_set = {decode_key(i) for i in delete_buffer_set}
 
-        if return_key:
-            if self._raw and decode_raw:
-                buffer_keys_set = {decode_key(i) for i in buffer_dict.keys()}
-            else:
-                buffer_keys_set = set(buffer_dict.keys())
-        if return_value:
-            if self._raw and decode_raw:
-                buffer_values_list = [decode(i) for i in buffer_dict.values()]
+        if keys_only:
+            if decode_keys:
+                buffer = {decode_key(i) for i in buffer_dict.keys()}
             else:
-                buffer_values_list = list(self.buffer_dict.values())
-        if not return_buffer_dict:
-            buffer_dict = None
+                buffer = set(buffer_dict.keys())
+        elif decode_keys:
+            buffer = {decode_key(k): decode(v) for k, v in buffer_dict.items()}
         else:
-            if self._raw and decode_raw:
-                buffer_dict = {decode_key(k): decode(v) for k, v in buffer_dict.items()}
-
-        return (
-            buffer_dict,
-            buffer_keys_set,
-            buffer_values_list,
-            delete_buffer_set,
-            static_view,
-        )
+            buffer = buffer_dict
+
+        return buffer, delete_buffer_set, view
 
     def values(self, decode_raw=True):
         """
-        Retrieves all the values in the database and buffer.
+        Iterates over all the values in the database and buffer.
 
         Returns:
-            list: A list of values
+            generator: A generator of values
         """
-        values_list = []
         for key, value in self.items(decode_raw):
-            values_list.append(value)
-        return values_list
+            yield value
 
     def keys(self, decode_raw=True):
         """
@@ -713,32 +962,31 @@ class BaseDBDict(ABC):
         Returns:
             list: A list of keys.
         """
-        (
-            buffer_dict,
-            buffer_keys,
-            buffer_values,
-            delete_buffer_set,
-            view,
-        ) = self._get_status_info(
-            return_key=True,
-            return_view=False if self._cache_all_db else True,
-            decode_raw=decode_raw,
+        buffer_keys, delete_buffer_set, view = self._get_buffer_snapshot(
+            return_view=True, decode_raw=decode_raw, keys_only=True
         )
 
-        for key in buffer_keys:
-            yield key
+        raw_keys = self._raw and not decode_raw
+        try:
+            yield from buffer_keys
 
-        if self._cache_all_db:
-            # `view` is None
-            for key in self._cache_dict.keys():
-                if key not in delete_buffer_set and key not in buffer_keys:
-                    yield key
-        else:
-            for key in self._iter_db_view(view, include_value=False):
-                d_key = decode_key(key)
-                if d_key not in delete_buffer_set and key not in buffer_keys:
-                    yield d_key
-            self._db_manager.close_static_view(view)
+            if self._cache_all_db:
+                # `view` is a copy of the cache
+                for key in view.keys():
+                    if key not in delete_buffer_set and key not in buffer_keys:
+                        yield key
+            elif not (buffer_keys or delete_buffer_set):
+                # nothing pending: the db keys are the answer as they are
+                db_keys = self._iter_db_view(view, include_value=False)
+                yield from db_keys if raw_keys else map(decode_key, db_keys)
+            else:
+                db_keys = self._iter_db_view(view, include_value=False)
+                for key in db_keys if raw_keys else map(decode_key, db_keys):
+                    if key not in delete_buffer_set and key not in buffer_keys:
+                        yield key
+        finally:
+            if not self._cache_all_db:
+                self._db_manager.close_static_view(view)
 
     def to_dict(self, decode_raw=True):
         """
@@ -752,91 +1000,79 @@ class BaseDBDict(ABC):
         Retrieves all the key-value pairs in the database and buffer.
         Returns: dict
         """
-        (
-            buffer_dict,
-            buffer_keys,
-            buffer_values,
-            delete_buffer_set,
-            view,
-        ) = self._get_status_info(
-            return_buffer_dict=True,
-            return_view=False if self._cache_all_db else True,
-            decode_raw=decode_raw,
+        buffer_dict, delete_buffer_set, view = self._get_buffer_snapshot(
+            return_view=True, decode_raw=decode_raw
         )
 
         if self._cache_all_db:
-            _db_dict = self._cache_dict.copy()
+            _db_dict = view
+            for key in delete_buffer_set:
+                _db_dict.pop(key, None)
         else:
             _db_dict = {}
-            for key, value in self._iter_db_view(view):
-                dk = decode_key(key)
-                if dk not in delete_buffer_set:
-                    _db_dict[dk] = decode(value)
+            try:
+                for key, value in self._iter_db_view(view):
+                    dk = decode_key(key)
+                    if dk not in delete_buffer_set:
+                        _db_dict[dk] = decode(value)
+            finally:
+                self._db_manager.close_static_view(view)
 
         if _db_dict:
             _db_dict.update(buffer_dict)
         else:
             _db_dict = buffer_dict
 
-        self._db_manager.close_static_view(view)
         return _db_dict
 
     def items(self, decode_raw=True):
         """
-        Retrieves all the key-value pairs in the database and buffer.
+        Iterates over all the key-value pairs in the database and buffer.
+        Database values are decoded one at a time as the view is walked.
 
         Returns:
-            list: A list of key-value pairs
-        """
-        (
-            buffer_dict,
-            buffer_keys,
-            buffer_values,
-            delete_buffer_set,
-            view,
-        ) = self._get_status_info(
-            return_key=True,
-            return_buffer_dict=True,
-            return_view=False if self._cache_all_db else True,
-            decode_raw=decode_raw,
+            generator: A generator of key-value pairs
+        """
+        buffer_dict, delete_buffer_set, view = self._get_buffer_snapshot(
+            return_view=True, decode_raw=decode_raw
         )
-        for key, value in buffer_dict.items():
-            if key not in delete_buffer_set:
-                yield key, value
 
-        if self._cache_all_db:
-            for (
-                key,
-                value,
-            ) in self._cache_dict.items():  # Attention: dict.items() is a dynamic view
-                if key not in delete_buffer_set and key not in buffer_keys:
-                    yield key, value
-        else:
-            for key, value in self._iter_db_view(view):
-                # for key, value in view.iterator():
-                dk = decode_key(key)
-                if dk not in delete_buffer_set and key not in buffer_keys:
-                    yield dk, decode(value)
-            self._db_manager.close_static_view(view)
+        raw_keys = self._raw and not decode_raw
+        try:
+            yield from buffer_dict.items()
+
+            if self._cache_all_db:
+                # `view` is a copy of the cache
+                for key, value in view.items():
+                    if key not in delete_buffer_set and key not in buffer_dict:
+                        yield key, value
+            elif raw_keys:
+                for key, value in self._iter_db_view(view):
+                    if key not in delete_buffer_set and key not in buffer_dict:
+                        yield key, value
+            else:
+                for key, value in self._iter_db_view(view):
+                    dk = decode_key(key)
+                    if dk not in delete_buffer_set and dk not in buffer_dict:
+                        yield dk, decode(value)
+        finally:
+            if not self._cache_all_db:
+                self._db_manager.close_static_view(view)
 
     def _pull_db_data_to_cache(self, decode_raw=True):
         """
         Retrieves all the key-value pairs in the database.
         Load db data to self._cache_dict
         """
-        (
-            buffer_dict,
-            buffer_keys,
-            buffer_values,
-            delete_buffer_set,
-            view,
-        ) = self._get_status_info(return_view=True, decode_raw=decode_raw)
-        for key, value in self._iter_db_view(view):
-            dk = decode_key(key)
-            if dk not in delete_buffer_set:
-                self._cache_dict[dk] = decode(value)
-
-        self._db_manager.close_static_view(view)
+        # called from `_init` while the buffer is still empty, so the view is read as is
+        view = self._db_manager.new_static_view()
+        try:
+            self._cache_dict = {
+                decode_key(key): decode(value)
+                for key, value in self._iter_db_view(view)
+            }
+        finally:
+            self._db_manager.close_static_view(view)
 
     @abstractmethod
     def stat(self, *args, **kwargs):
@@ -865,10 +1101,7 @@ class LMDBDict(BaseDBDict):
     _instances = {}
 
     def __new__(cls, db_name: str, root_path: str, rebuild=False, **kwargs):
-        name = db_name + str(root_path)
-        if name not in cls._instances:
-            cls._instances[name] = super().__new__(cls)
-        return cls._instances[name]
+        return _get_instance(cls, db_name, root_path)
 
     def __init__(
         self,
@@ -890,6 +1123,11 @@ class LMDBDict(BaseDBDict):
             )
             self._initialized = True
 
+    def _init(self):
+        # handle of the main database, to read the number of entries of a view
+        self._main_db = self._db_manager.env.open_db()
+        super()._init()
+
     def _iter_db_view(self, view, include_key=True, include_value=True):
         """
         Iterates over the items in the database view.
@@ -897,14 +1135,36 @@ class LMDBDict(BaseDBDict):
         Args:
             view: The database view to iterate over.
         """
-
-        cursor = view.cursor()
-        if include_key and include_value:
-            for key, value in cursor.iternext(keys=include_key, values=include_value):
-                yield key, value
-        else:
-            for key_or_value in cursor.iternext(keys=include_key, values=include_value):
-                yield key_or_value
+        # the cursor iterator is returned as is, without a Python generator per item
+        return view.cursor().iternext(keys=include_key, values=include_value)
+
+    def _get_multi_from_view(self, view, keys):
+        with view.cursor() as cursor:
+            return dict(cursor.getmulti(keys))
+
+    def _delete_keys(self, wb, keys):
+        # walk the keys in order with one cursor, missing keys are skipped
+        keys.sort()
+        with wb.cursor() as cursor:
+            for key in keys:
+                if cursor.set_key(key):
+                    cursor.delete()
+
+    def _put_items(self, wb, items):
+        # Sorted keys are inserted along the B-tree in order, and the ones past the
+        # current last key are appended to the rightmost page (MDB_APPEND).
+        items.sort()
+        with wb.cursor() as cursor:
+            split = 0
+            if cursor.last():
+                last_key = cursor.key()
+                split = len(items)
+                for idx, (key, _) in enumerate(items):
+                    if key > last_key:
+                        split = idx
+                        break
+            cursor.putmulti(items[:split])
+            cursor.putmulti(items[split:], append=True)
 
     def set_mapsize(self, map_size):
         """Change the maximum size of the map file.
@@ -916,28 +1176,27 @@ class LMDBDict(BaseDBDict):
             self._logger.error(f"Error setting map size: {e}")
 
     def stat(self):
+        # a flush updates the counters together with the static view, read them at once
+        with self._buffer_lock:
+            buffer_num = self._stat_buffer_num
+            marked_delete_num = self._marked_delete_num
+            if self._cache_all_db:
+                db_count = len(self._cache_dict)
+            else:
+                # unlike `env.stat()`, the view does not see a commit before it is accounted
+                db_count = self._static_view.stat(self._main_db)['entries']
+
         if self._cache_all_db:
-            db_count = len(self._cache_dict)
-            count = db_count + self._stat_buffer_num
-            return {
-                'count': count,
-                'buffer': self._stat_buffer_num,
-                'db': db_count,
-                'marked_delete': len(self.delete_buffer_set),
-                "type": 'lmdb',
-            }
+            count = db_count + buffer_num
         else:
-            env = self._db_manager.get_env()
-            stats = env.stat()
-            db_count = stats['entries']
-            count = db_count + self._stat_buffer_num - len(self.delete_buffer_set)
-            return {
-                'count': count,
-                'buffer': self._stat_buffer_num,
-                'db': db_count,
-                'marked_delete': len(self.delete_buffer_set),
-                "type": 'lmdb',
-            }
+            count = db_count + buffer_num - marked_delete_num
+        return {
+            'count': count,
+            'buffer': buffer_num,
+            'db': db_count,
+            'marked_delete': marked_delete_num,
+            "type": 'lmdb',
+        }
 
 
 class LevelDBDict(BaseDBDict):
@@ -951,10 +1210,7 @@ class LevelDBDict(BaseDBDict):
     _instances = {}
 
     def __new__(cls, db_name: str, root_path: str, rebuild=False, **kwargs):
-        name = db_name + str(root_path)
-        if name not in cls._instances:
-            cls._instances[name] = super().__new__(cls)
-        return cls._instances[name]
+        return _get_instance(cls, db_name, root_path)
 
     def __init__(self, db_name: str, root_path: str, rebuild=False, **kwargs):
         if not hasattr(self, '_initialized'):
@@ -975,51 +1231,73 @@ class LevelDBDict(BaseDBDict):
         Args:
             view: The database view to iterate over.
         """
-        if include_key and include_value:
-            for key, value in view.iterator(
-                include_key=include_key, include_value=include_value
-            ):
-                yield key, value
-        else:
-            for key_or_value in view.iterator(
-                include_key=include_key, include_value=include_value
-            ):
-                yield key_or_value
+        return view.iterator(include_key=include_key, include_value=include_value)
 
-    def stat(self):
+    def _get_multi_from_view(self, view, keys):
+        # plyvel has no multi-get: sweep one iterator over the sorted keys
+        result = {}
+        iterator = view.iterator()
+        try:
+            for key in keys:
+                iterator.seek(key)
+                try:
+                    db_key, value = next(iterator)
+                except StopIteration:
+                    break
+                if db_key == key:
+                    result[key] = value
+        finally:
+            iterator.close()
+        return result
 
-        if self._cache_all_db:
-            db_keys = set(self._cache_dict.keys())
-            db_count = len(db_keys)
-            count = db_count + self._stat_buffer_num
-            return {
-                'count': count,
-                'buffer': self._stat_buffer_num,
-                'db': db_count,
-                'marked_delete': len(self.delete_buffer_set),
-                "type": 'leveldb',
-            }
-        else:
+    def _count_db_keys(self):
+        """
+        Counts the keys in the db with one scan, outside the buffer lock.
+        The count is kept only if no flush replaced the static view meanwhile.
+        """
+        while True:
             with self._buffer_lock:
+                if self._db_count is not None:
+                    return
+                static_view = self._static_view
                 view = self._db_manager.new_static_view()
+            try:
+                db_count = sum(1 for _ in self._iter_db_view(view, include_value=False))
+            finally:
+                self._db_manager.close_static_view(view)
+            with self._buffer_lock:
+                if self._static_view is static_view:
+                    self._db_count = db_count
+                    return
 
-            db_keys = {key for key in view.iterator(include_value=False)}
-            view.close()
-
-        db_count = len(db_keys)
-        # db_valid_keys = db_keys - self.delete_buffer_set
-        # buffer_keys = set(self.buffer_dict.keys())
-        # intersection_count = len(buffer_keys.intersection(db_valid_keys))
-        # count = len(db_valid_keys) + self._stat_buffer_num - intersection_count
-        count = db_count + self._stat_buffer_num - len(self.delete_buffer_set)
+    def stat(self):
+        while True:
+            # a flush updates the counters and `_db_count` together, read them at once
+            with self._buffer_lock:
+                buffer_num = self._stat_buffer_num
+                marked_delete_num = self._marked_delete_num
+                if self._cache_all_db:
+                    db_count = len(self._cache_dict)
+                else:
+                    db_count = self._db_count
+            if db_count is not None:
+                break
+            # LevelDB has no key count: scan once, then each flush keeps it up to date
+            self._count_db_keys()
 
-        # db_valid_keys = db_keys.union(buffer_keys) - self.delete_buffer_set
-        # count = len(db_valid_keys)
+        if self._cache_all_db:
+            count = db_count + buffer_num
+        else:
+            # db_valid_keys = db_keys - self.delete_buffer_set
+            # buffer_keys = set(self.buffer_dict.keys())
+            # intersection_count = len(buffer_keys.intersection(db_valid_keys))
+            # count = len(db_valid_keys) + self._stat_buffer_num - intersection_count
+            count = db_count + buffer_num - marked_delete_num
         return {
             'count': count,
-            'buffer': self._stat_buffer_num,
+            'buffer': buffer_num,
             "db": db_count,
-            'marked_delete': len(self.delete_buffer_set),
+            'marked_delete': marked_delete_num,
             'type': 'leveldb',
         }
 
@@ -1070,13 +1348,18 @@ class RemoteDBDict(BaseDBDict):
 
     def _attach_db(self):
         def set_cache(data):
+            # decode the whole update with one call for the keys and one for the values
             if data.type == "buffer_dict":
                 buffer_dict = data.data
-                for raw_key, raw_value in buffer_dict.items():
-                    self._cache_dict[decode_key(raw_key)] = decode(raw_value)
+                self._cache_dict.update(
+                    zip(
+                        decode_key_batch(buffer_dict.keys()),
+                        decode_batch(buffer_dict.values()),
+                    )
+                )
             elif data.type == "delete_keys":
-                for raw_key in data.data.keys():
-                    self._cache_dict.pop(decode_key(raw_key))
+                for key in decode_key_batch(data.data.keys()):
+                    self._cache_dict.pop(key)
             else:
                 raise ValueError(f"Unknown data type: {data['type']}")
 
@@ -1091,65 +1374,67 @@ class RemoteDBDict(BaseDBDict):
 
         self._start_event.wait()
 
-        (
-            buffer_dict,
-            buffer_keys,
-            buffer_values,
-            delete_buffer_set,
-            view,
-        ) = self._get_status_info(return_view=True, decode_raw=decode_raw)
+        _, delete_buffer_set, _ = self._get_buffer_snapshot(
+            decode_raw=decode_raw, keys_only=True
+        )
 
-        view: RemoteTransaction
+        view: RemoteTransaction = self._db_manager.new_static_view()
         view.check_db_exist()
-        with view.client.stream("GET", f"/dict_stream?db_name={self._db_name}") as r:
-            buffer = bytearray()
-            for data in r.iter_bytes():
-                buffer.extend(data)
-
-        remote_db_dict = decode(bytes(buffer))
-        for dk, dv in remote_db_dict.items():
+        for raw_key, raw_value in self._iter_stream_items(
+            view, f"/dict_stream?db_name={self._db_name}"
+        ):
+            dk = decode_key(raw_key)
             if dk not in delete_buffer_set:
-                self._cache_dict[dk] = dv
+                self._cache_dict[dk] = decode(raw_value)
 
     def _iter_db_view(self, view, include_key=True, include_value=True):
         """
         Just a placeholder, now we don't use it.
         """
 
+    @staticmethod
+    def _fetch_stream(view, url):
+        """
+        Reads a streamed response body into a single bytes object.
+        """
+        with view.client.stream("GET", url) as r:
+            # one allocation for the whole payload, and no extra copy before decoding
+            return b"".join(r.iter_bytes())
+
+    @staticmethod
+    def _iter_stream_items(view, url):
+        """
+        Yields the raw (key, value) records of a streamed response as they arrive.
+        """
+        with view.client.stream("GET", url) as r:
+            # the next chunks are read from the network while the current ones are decoded
+            yield from unpack_items(prefetch(r.iter_bytes()))
+
     def keys(self, fetch_all=True, decode_raw=True):
-        (
-            buffer_dict,
-            buffer_keys,
-            buffer_values,
-            delete_buffer_set,
-            view,
-        ) = self._get_status_info(
-            return_key=True,
-            return_view=False if self._cache_all_db else True,
-            decode_raw=decode_raw,
+        buffer_keys, delete_buffer_set, view = self._get_buffer_snapshot(
+            return_view=True, decode_raw=decode_raw, keys_only=True
         )
 
-        for key in buffer_keys:
-            if key not in delete_buffer_set:
-                yield key
+        # deleted keys are already left out of `buffer_keys`
+        yield from buffer_keys
 
+        excluded = delete_buffer_set | buffer_keys
         if self._cache_all_db:
-            for key in self._cache_dict.keys():
-                if key not in delete_buffer_set and key not in buffer_keys:
+            # `view` is a copy of the cache
+            for key in view.keys():
+                if key not in excluded:
                     yield key
 
         else:
             if fetch_all:
-                with view.client.stream(
-                    "GET", f"/keys_stream?db_name={self._db_name}"
-                ) as r:
-                    buffer = bytearray()
-                    for data in r.iter_bytes():
-                        buffer.extend(data)
-
-                db_keys = set(decode_key(bytes(buffer)))
-                for key in db_keys - delete_buffer_set - buffer_keys:
-                    yield key
+                db_keys = set(
+                    decode_key(
+                        self._fetch_stream(
+                            view, f"/keys_stream?db_name={self._db_name}"
+                        )
+                    )
+                )
+                yield from db_keys - excluded
 
             else:
                 raise NotImplementedError
@@ -1161,33 +1446,22 @@ class RemoteDBDict(BaseDBDict):
             raise NotImplementedError
 
     def db_dict(self, decode_raw=True):
-        (
-            buffer_dict,
-            buffer_keys,
-            buffer_values,
-            delete_buffer_set,
-            view,
-        ) = self._get_status_info(
-            return_buffer_dict=True,
-            return_view=True,
-            decode_raw=decode_raw,
+        buffer_dict, delete_buffer_set, view = self._get_buffer_snapshot(
+            return_view=True, decode_raw=decode_raw
         )
 
         if self._cache_all_db:
-            _db_dict = self._cache_dict.copy()
+            _db_dict = view
+            for key in delete_buffer_set:
+                _db_dict.pop(key, None)
         else:
             _db_dict = {}
-            with view.client.stream(
-                "GET", f"/dict_stream?db_name={self._db_name}"
-            ) as r:
-                buffer = bytearray()
-                for data in r.iter_bytes():
-                    buffer.extend(data)
-
-            remote_db_dict = decode(bytes(buffer))
-            for dk, dv in remote_db_dict.items():
+            for raw_key, raw_value in self._iter_stream_items(
+                view, f"/dict_stream?db_name={self._db_name}"
+            ):
+                dk = decode_key(raw_key)
                 if dk not in delete_buffer_set:
-                    _db_dict[dk] = dv
+                    _db_dict[dk] = decode(raw_value)
 
         if _db_dict:
             _db_dict.update(buffer_dict)
@@ -1197,23 +1471,26 @@ class RemoteDBDict(BaseDBDict):
         return _db_dict
 
     def stat(self):
-        if self._cache_all_db:
-            db_count = len(self._cache_dict)
+        with self._buffer_lock:
             buffer_num = self._stat_buffer_num
+            marked_delete_num = self._marked_delete_num
+            if self._cache_all_db:
+                db_count = len(self._cache_dict)
+
+        if self._cache_all_db:
             count = db_count + buffer_num
         else:
             # fixme:
             env = self._db_manager.get_env()
             stats = env.stat()
             db_count = stats['count']
-            buffer_num = self._stat_buffer_num
-            count = db_count + buffer_num - len(self.delete_buffer_set)
+            count = db_count + buffer_num - marked_delete_num
 
         return {
             'count': count,
             'buffer': buffer_num,
             'db': db_count,
-            'marked_delete': len(self.delete_buffer_set),
+            'marked_delete': marked_delete_num,
             'type': 'remote',
         }
 
@@ -13,6 +13,7 @@
 # limitations under the License.
 
 import queue
+import threading
 
 
 class SimpleQueue:
@@ -35,3 +36,48 @@ class SimpleQueue:
     def clear(self):
         while not self.empty():
             self.get()
+
+
+def prefetch(iterable, maxsize=16):
+    """
+    Iterates `iterable` in a background thread and keeps up to `maxsize` items ready,
+    so that producing the next items (e.g. reading from a socket) overlaps with
+    consuming the current one. Exceptions of the iteration are raised to the consumer.
+    """
+    q = queue.Queue(maxsize=maxsize)
+    stop = threading.Event()
+    end = object()
+
+    def put(item):
+        while not stop.is_set():
+            try:
+                q.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def produce():
+        try:
+            for item in iterable:
+                if not put((item, None)):
+                    return
+        except BaseException as e:
+            put((end, e))
+        else:
+            put((end, None))
+
+    thread = threading.Thread(target=produce, daemon=True)
+    thread.start()
+    try:
+        while True:
+            item, error = q.get()
+            if item is end:
+                if error is not None:
+                    raise error
+                return
+            yield item
+    finally:
+        stop.set()
+        # the iterable must not be used after the consumer has moved on
+        thread.join()
@@ -17,11 +17,9 @@ from __future__ import annotations
 
 import io
 import os
-import re
 import shutil
 import threading
 import time
-import traceback
 from pathlib import Path
 from typing import Dict, Literal
 from uuid import uuid4
@@ -55,15 +53,20 @@ class DBManager:
         self.db_type = db_type.lower()
         self.db_name = db_name
         self._rebuild = rebuild
+        self._connect_kwargs = kwargs
 
-        url_pattern = re.compile(r'^(http://|https://|ftp://)')
-        if url_pattern.match(root_path_or_url):
+        if root_path_or_url.startswith(("http://", "https://", "ftp://")):
             self.db_address = root_path_or_url
             self.db_name = f"{db_name}-{kwargs.get('backend', 'leveldb')}"
         else:
-            self.db_address = os.path.join(
-                root_path_or_url, f"{db_name}-{self.db_type}"
-            )
+            db_dir = f"{db_name}-{self.db_type}"
+            if os.altsep or not root_path_or_url:
+                # leave drive letters and mixed separators to ntpath
+                self.db_address = os.path.join(root_path_or_url, db_dir)
+            elif root_path_or_url.endswith(os.sep):
+                self.db_address = root_path_or_url + db_dir
+            else:
+                self.db_address = root_path_or_url + os.sep + db_dir
 
             root_path = Path(root_path_or_url)
             if not root_path.exists():
@@ -88,6 +91,14 @@ class DBManager:
                 self.db_address,
                 max_dbs=kwargs.get('max_dbs', 1),
                 map_size=kwargs.get('map_size', 2 * 1024**3),
+                # opt-in: `writemap` commits through the memory map instead of write()
+                # calls; with `map_async` a system crash may lose the last transactions
+                writemap=kwargs.get('writemap', False),
+                map_async=kwargs.get('map_async', False),
+                # opt-in: without `sync`/`metasync` commits skip fsync, the data is
+                # flushed to disk on close; a system crash may lose the last commits
+                sync=kwargs.get('sync', True),
+                metasync=kwargs.get('metasync', True),
             )
 
         elif self.db_type == "leveldb":
@@ -136,7 +147,7 @@ class DBManager:
         except:
             pass
         self.rmtree()
-        self.env = self.connect()
+        self.env = self.connect(**self._connect_kwargs)
 
     def get_env(self):
         """
@@ -193,7 +204,6 @@ class DBManager:
         elif self.db_type == "remote":
             return self.env
         else:
-            traceback.print_exc()
             raise ValueError(f"Unsupported DB type {self.db_type}.")
 
     def close(self):
@@ -201,6 +211,15 @@ class DBManager:
         Closes the database connection.
         """
         if self.db_type == "lmdb":
+            if not (
+                self._connect_kwargs.get('sync', True)
+                and self._connect_kwargs.get('metasync', True)
+            ):
+                try:
+                    self.env.sync(True)
+                except Exception:
+                    # already closed
+                    pass
             return self.env.close()
         elif self.db_type == "leveldb":
             return self.env.close()
@@ -267,7 +286,6 @@ class RemoteTransaction:
             try:
                 for chunk in r.iter_raw(chunk_size=chunk_size):
                     if chunk == b"data: end\n\n":
-                        print(f"{buffer=}")
                         yield msgspec.msgpack.decode(
                             bytes(buffer), type=StructUpdateData
                         )
@@ -376,7 +394,6 @@ class RemoteTransaction:
         if self.delete_buffer_set:
             self._delete_batch()
         if exc_type is not None:
-            traceback.print_exception(exc_type, exc_val, exc_tb)
             return False
 
     def close(self):
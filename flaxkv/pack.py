@@ -13,6 +13,7 @@
 # limitations under the License.
 
 import pickle
+import struct
 
 import msgpack
 import msgspec.msgpack
@@ -96,3 +97,65 @@ def decode_key(value, use_pickle=False):
     if use_pickle:
         return pickle.loads(value)
     return msgpack.unpackb(value, use_list=False)
+
+
+def _pack_array(items) -> bytes:
+    """
+    Joins encoded objects into one encoded msgpack array.
+    """
+    items = list(items)
+    n = len(items)
+    if n < 16:
+        header = bytes((0x90 | n,))
+    elif n < 0x10000:
+        header = struct.pack(">BH", 0xDC, n)
+    else:
+        header = struct.pack(">BI", 0xDD, n)
+    return header + b"".join(items)
+
+
+def decode_batch(values) -> list:
+    """
+    Decodes many encoded values with a single decoder call.
+    """
+    return msg_decoder.decode(_pack_array(values))
+
+
+def decode_key_batch(keys) -> tuple:
+    """
+    Decodes many encoded keys with a single unpacker call.
+    """
+    return msgpack.unpackb(_pack_array(keys), use_list=False)
+
+
+# (key length, value length) prefix of a streamed key-value record
+_ITEM_HEADER = struct.Struct("<II")
+
+
+def pack_item(key: bytes, value: bytes) -> bytes:
+    return _ITEM_HEADER.pack(len(key), len(value)) + key + value
+
+
+def unpack_items(chunks):
+    """
+    Yields the (key, value) records of a stream of `pack_item` bytes,
+    records may be split across chunks.
+    """
+    header_size = _ITEM_HEADER.size
+    buffer = bytearray()
+    for chunk in chunks:
+        buffer += chunk
+        offset = 0
+        while len(buffer) - offset >= header_size:
+            key_len, value_len = _ITEM_HEADER.unpack_from(buffer, offset)
+            key_start = offset + header_size
+            value_start = key_start + key_len
+            end = value_start + value_len
+            if end > len(buffer):
+                break
+            yield bytes(buffer[key_start:value_start]), bytes(buffer[value_start:end])
+            offset = end
+        # keep only the incomplete record
+        del buffer[:offset]
+    if buffer:
+        raise ValueError("Stream ended within a record.")
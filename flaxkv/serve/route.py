@@ -17,12 +17,15 @@ from __future__ import annotations
 
 import asyncio
 import io
+import itertools
 import os
+import threading
 import traceback
 from typing import AsyncGenerator
 
 import msgspec
 from litestar import MediaType, Request, get, post, status_codes
+from litestar.concurrency import sync_to_thread
 from litestar.datastructures import UploadFile
 from litestar.enums import RequestEncodingType
 from litestar.exceptions import HTTPException
@@ -31,7 +34,7 @@ from litestar.response import Stream
 from rich import print
 from typing_extensions import Annotated
 
-from ..pack import encode
+from ..pack import encode, pack_item
 from .interface import (
     AttachRequest,
     DetachRequest,
@@ -359,12 +362,57 @@ async def get_batch_stream_(db_name: str, request: Request) -> Stream:
         raise HTTPException(status_code=500, detail=str(e))
 
 
+def _pack_chunks(items, chunk_size):
+    chunk = bytearray()
+    for key, value in items:
+        chunk += pack_item(key, value)
+        if len(chunk) >= chunk_size:
+            yield bytes(chunk)
+            chunk = bytearray()
+    if chunk:
+        yield bytes(chunk)
+
+
+async def items_stream_generator(
+    items, first=None, chunk_size=1024 * 1024
+) -> AsyncGenerator[bytes, None]:
+    """
+    Streams the records of `items` (preceded by `first`, if any) in chunks.
+    The db is iterated in a worker thread so that the event loop is not blocked,
+    and `items` is closed at the end so that its view is released even when the
+    client disconnects mid-stream.
+    """
+    records = items if first is None else itertools.chain((first,), items)
+    chunks = _pack_chunks(records, chunk_size)
+    lock = threading.Lock()
+
+    def next_chunk():
+        with lock:
+            return next(chunks, None)
+
+    try:
+        while True:
+            chunk = await sync_to_thread(next_chunk)
+            if chunk is None:
+                break
+            yield chunk
+    finally:
+        # a cancelled `next_chunk` keeps running in its thread, wait for it
+        with lock:
+            chunks.close()
+            items.close()
+
+
 @get("/dict_stream", media_type=MediaType.TEXT)
 async def dict_stream_(db_name: str) -> Stream:
     db = _get_db(db_name)
     try:
-        result_bin = encode(db.db_dict())
-        return Stream(stream_generator(result_bin))
+        # raw records are framed one by one, nothing is decoded or re-encoded here
+        items = db.items(decode_raw=False)
+        # pull the first record here so that the snapshot and the view are taken
+        # inside the try, otherwise a failure would only truncate the body
+        first = next(items, None)
+        return Stream(items_stream_generator(items, first))
     except Exception as e:
         traceback.print_exc()
         raise HTTPException(status_code=500, detail=str(e))
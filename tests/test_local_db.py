@@ -9,6 +9,7 @@ import pandas as pd
 import pytest
 
 from flaxkv import FlaxKV
+from flaxkv.pack import pack_item, unpack_items
 
 
 @pytest.fixture(
@@ -296,3 +297,96 @@ def test_list_keys_values_items(temp_db):
     assert set(temp_db.keys()) == set(data.keys())
     assert set(temp_db.values()) == set(data.values())
     assert set(temp_db.items()) == set(data.items())
+
+    # a buffered overwrite of a flushed key is yielded once
+    temp_db["key1"] = "new_value1"
+    data["key1"] = "new_value1"
+    assert sorted(temp_db.keys()) == sorted(data.keys())
+    assert sorted(temp_db.values()) == sorted(data.values())
+    assert sorted(temp_db.items()) == sorted(data.items())
+
+
+def test_get_batch(temp_db):
+    if temp_db is None:
+        pytest.skip("Skipping")
+    data = {f"key{i}": f"value{i}" for i in range(20)}
+    temp_db.update(data)
+    temp_db.write_immediately(block=True)
+
+    temp_db["key_buffer"] = "value_buffer"
+    del temp_db["key3"]
+    keys = ["key1", "key3", "key_buffer", "no_exist_key", "key19", "key0"]
+    assert temp_db.get_batch(keys) == [
+        "value1",
+        None,
+        "value_buffer",
+        None,
+        "value19",
+        "value0",
+    ]
+
+
+def test_get_default_not_stored(temp_db):
+    if temp_db is None:
+        pytest.skip("Skipping")
+    assert temp_db.get("no_exist_key", "default") == "default"
+    with pytest.raises(KeyError):
+        temp_db["no_exist_key"]
+    assert "no_exist_key" not in temp_db
+
+    temp_db.write_immediately(block=True)
+    assert "no_exist_key" not in temp_db
+    assert len(temp_db) == 0
+
+
+def test_db_dict(temp_db):
+    if temp_db is None:
+        pytest.skip("Skipping")
+    temp_db.update({"a": 1, "b": 2})
+    temp_db.write_immediately(block=True)
+
+    temp_db["a"] = 3
+    del temp_db["a"]
+    temp_db["c"] = 4
+    assert temp_db.db_dict() == {"b": 2, "c": 4}
+    assert dict(temp_db.items()) == {"b": 2, "c": 4}
+
+
+@pytest.mark.parametrize("backend", ["leveldb", "lmdb"])
+def test_write_while_iterating_cache(backend, tmp_path):
+    db = FlaxKV("iter_cache_db", str(tmp_path), backend=backend, cache=True)
+    db.update({f"key{i}": i for i in range(10)})
+    db.write_immediately(block=True)
+
+    for name, method in (("keys", db.keys), ("items", db.items)):
+        expected = len(db)
+        seen = 0
+        for _ in method():
+            # the flush updates the cache while it is iterated
+            db[f"{name}{seen}"] = seen
+            db.write_immediately(block=True)
+            seen += 1
+        assert seen == expected
+    assert len(db) == 10 + 10 + 20
+    db.destroy()
+
+
+@pytest.mark.parametrize("backend", ["leveldb", "lmdb"])
+def test_aliased_root_path(backend, tmp_path):
+    root_path = str(tmp_path)
+    db = FlaxKV("alias_db", root_path, backend=backend)
+    assert FlaxKV("alias_db", os.path.join(root_path, "."), backend=backend) is db
+    assert FlaxKV("alias_db", root_path + os.sep, backend=backend) is db
+    db.destroy()
+
+
+def test_unpack_items_across_chunks():
+    records = [(b"a", b""), (b"key", b"value"), (b"k" * 300, b"v" * 1000)]
+    data = b"".join(pack_item(key, value) for key, value in records)
+
+    for size in (1, 3, 7, 64, len(data)):
+        chunks = [data[i : i + size] for i in range(0, len(data), size)]
+        assert list(unpack_items(chunks)) == records
+
+    with pytest.raises(ValueError):
+        list(unpack_items([data[:-1]]))
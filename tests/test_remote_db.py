@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import asyncio
 import subprocess
 import time
 
@@ -67,3 +68,32 @@ from test_local_db import (
     test_setdefault,
     test_update,
 )
+
+
+def test_items_stream_releases_view(tmp_path, monkeypatch):
+    # the route module opens its DBManager in the working directory
+    monkeypatch.chdir(tmp_path)
+    from flaxkv.pack import unpack_items
+    from flaxkv.serve.route import items_stream_generator
+
+    closed = []
+
+    def items():
+        try:
+            for i in range(1000):
+                yield b"key%d" % i, b"x" * 100
+        finally:
+            closed.append(True)
+
+    async def read_first_chunk(records):
+        stream = items_stream_generator(records, next(records), chunk_size=1024)
+        chunk = await stream.__anext__()
+        # the client disconnects
+        await stream.aclose()
+        return chunk
+
+    # keep a reference, so that only an explicit close runs the `finally`
+    records = items()
+    chunk = asyncio.run(read_first_chunk(records))
+    assert next(unpack_items([chunk])) == (b"key0", b"x" * 100)
+    assert closed == [True]
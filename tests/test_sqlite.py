@@ -0,0 +1,81 @@
+from __future__ import annotations
+
+import os
+import sqlite3
+
+import pytest
+
+from flaxkv._sqlite import SQLiteDict
+
+
+@pytest.fixture
+def sqlite_dir(tmp_path, monkeypatch):
+    # SQLiteDict keeps its files under ./SQLiteDB
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(SQLiteDict, "_root_ready", False)
+    return tmp_path / "SQLiteDB"
+
+
+def test_reopen(sqlite_dir):
+    db = SQLiteDict("test.db")
+    db["a"] = 1
+    db.update({"b": [1, 2], 3: "c"})
+    db.close()
+
+    db = SQLiteDict("test.db")
+    assert len(db) == 3
+    assert db["a"] == 1
+    assert db["b"] == [1, 2]
+    assert db[3] == "c"
+    db.destroy()
+
+
+def test_uncommitted_writes(sqlite_dir, monkeypatch):
+    monkeypatch.setattr(SQLiteDict, "MAX_DIRTY", 10)
+    db = SQLiteDict("test.db")
+    for i in range(10):
+        db[i] = i
+
+    # the writes are committed once MAX_DIRTY is reached
+    conn = sqlite3.connect(str(sqlite_dir / "test.db"))
+    assert conn.execute("SELECT COUNT(*) FROM kv").fetchone()[0] == 10
+    conn.close()
+    db.destroy()
+
+
+def test_delete(sqlite_dir):
+    db = SQLiteDict("test.db")
+    db["a"] = 1
+    del db["a"]
+    assert "a" not in db
+    with pytest.raises(KeyError):
+        del db["a"]
+    with pytest.raises(KeyError):
+        db["a"]
+    db.destroy()
+
+
+def test_destroy(sqlite_dir):
+    db = SQLiteDict("test.db")
+    db["a"] = 1
+    db.destroy()
+    assert os.listdir(sqlite_dir) == []
+
+
+def test_write_while_iterating(sqlite_dir, monkeypatch):
+    # commit every write, so that they reach the db while it is iterated
+    monkeypatch.setattr(SQLiteDict, "MAX_DIRTY", 1)
+    monkeypatch.setattr(SQLiteDict, "FETCH_SIZE", 3)
+    db = SQLiteDict("test.db")
+    db.update({f"key{i}": i for i in range(10)})
+
+    seen = 0
+    for key in db:
+        db[f"new{seen}"] = seen
+        seen += 1
+    assert seen == 10
+
+    for key, value in db.items():
+        db[key] = value
+    assert len(db.keys()) == len(list(db.values())) == len(list(db.items())) == 20
+    db.destroy()